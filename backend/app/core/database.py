@@ -54,9 +54,10 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 # Initialize database
 async def init_db():
-    """Create all tables. Ensures pgvector extension exists for knowledge_base."""
+    """Create all tables. Ensures pgvector (knowledge_base) and pg_trgm (leads name search) exist."""
     async with engine.begin() as conn:
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         try:
             await conn.run_sync(Base.metadata.create_all)
         except Exception as e:
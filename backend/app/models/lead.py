@@ -141,6 +141,13 @@ class Lead(Base, IdMixin, TimestampMixin):
         Index('idx_pipeline_stage', 'pipeline_stage', 'stage_entered_at'),
         Index('idx_assigned_treatment', 'assigned_to', 'treatment_type'),
         Index('idx_next_action', 'next_action_at', 'treatment_type'),
+        # Trigram index for name ILIKE '%term%' search (needs pg_trgm)
+        Index(
+            'idx_leads_name_trgm',
+            'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        ),
         # Removed UniqueConstraint on phone to allow duplicate phones
     )
     
@@ -2,7 +2,7 @@
 Chat Provider Factory - instantiate chat providers by name.
 """
 import logging
-from typing import Dict, Any, List, Type
+from typing import Dict, Any, Optional, Tuple, Type
 
 from app.services.chat.base_provider import BaseChatProvider
 from app.services.chat.telegram_provider import TelegramProvider
@@ -18,6 +18,7 @@ class ChatProviderFactory:
         "telegram": TelegramProvider,
         "whatsapp": WhatsAppProvider,
     }
+    _supported_names: Optional[Tuple[str, ...]] = None
 
     @classmethod
     def create(cls, provider_name: str, config: Dict[str, Any]) -> BaseChatProvider:
@@ -47,8 +48,11 @@ class ChatProviderFactory:
     def register_provider(cls, provider_name: str, provider_class: Type[BaseChatProvider]) -> None:
         """Register a custom chat provider."""
         cls._providers[provider_name.lower()] = provider_class
+        cls._supported_names = None
 
     @classmethod
-    def get_supported_providers(cls) -> List[str]:
-        """Return list of supported provider names."""
-        return list(cls._providers.keys())
+    def get_supported_providers(cls) -> Tuple[str, ...]:
+        """Return supported provider names (cached until a provider is registered)."""
+        if cls._supported_names is None:
+            cls._supported_names = tuple(cls._providers)
+        return cls._supported_names
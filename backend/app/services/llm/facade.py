@@ -57,6 +57,29 @@ _DICOM_HINT_RE = re.compile(
 )
 
 
+# Fields every analyze_lead_qualification result carries. Only immutable
+# values live here; key_points gets a fresh list per result.
+_QUALIFICATION_DEFAULTS: Dict[str, Any] = {
+    "qualified": "maybe",
+    "interest_level": 5,
+    "budget": None,
+    "timeline": "unknown",
+    "name": None,
+    "phone": None,
+    "email": None,
+    "salary": None,
+    "location": None,
+    "dicom_status": None,
+    "morosidad_amount": None,
+    "score_delta": 0,
+}
+
+
+def _qualification_defaults(**overrides: Any) -> Dict[str, Any]:
+    """Return a new default qualification result, optionally overriding fields."""
+    return {**_QUALIFICATION_DEFAULTS, "key_points": [], **overrides}
+
+
 def _regex_extract_fields(message: str) -> Dict[str, Any]:
     """Best-effort regex extraction of name, phone, and email from a message.
 
@@ -276,21 +299,7 @@ class LLMServiceFacade:
 
         if not provider.is_configured:
             logger.warning("[LLMService] Provider not configured, returning defaults")
-            return {
-                "qualified": "maybe",
-                "interest_level": 5,
-                "budget": None,
-                "timeline": "unknown",
-                "name": None,
-                "phone": None,
-                "email": None,
-                "salary": None,
-                "location": None,
-                "dicom_status": None,
-                "morosidad_amount": None,
-                "key_points": [],
-                "score_delta": 0
-            }
+            return _qualification_defaults()
 
         # Build context
         existing_data = ""
@@ -397,26 +406,12 @@ Para "intent" (usa el que mejor describe la NECESIDAD PRINCIPAL del mensaje):
             )
 
             # Ensure all expected fields exist
-            defaults = {
-                "qualified": "maybe",
-                "interest_level": 5,
-                "budget": None,
-                "timeline": "unknown",
-                "name": None,
-                "phone": None,
-                "email": None,
-                "salary": None,
-                "location": None,
-                "dicom_status": None,
-                "morosidad_amount": None,
-                "key_points": [],
-                "score_delta": 0,
-                "intent": "general_chat",
-            }
-
-            for key, default in defaults.items():
+            for key, default in _QUALIFICATION_DEFAULTS.items():
                 if key not in result:
                     result[key] = default
+            if not isinstance(result.get("key_points"), list):
+                result["key_points"] = []
+            result.setdefault("intent", "general_chat")
 
             # Regex fallback: fill missing fields per-field when LLM returned empty/null
             _llm_empty = not result.get("name") and not result.get("phone") and not result.get("email")
@@ -468,21 +463,11 @@ Para "intent" (usa el que mejor describe la NECESIDAD PRINCIPAL del mensaje):
             _fallback = _regex_extract_fields(message)
             if _fallback:
                 logger.info("[LLM-facade] analysis failed but regex extracted: %s", list(_fallback.keys()))
-            return {
-                "qualified": "maybe",
-                "interest_level": 5,
-                "budget": None,
-                "timeline": "unknown",
-                "name": _fallback.get("name"),
-                "phone": _fallback.get("phone"),
-                "email": _fallback.get("email"),
-                "salary": None,
-                "location": None,
-                "dicom_status": None,
-                "morosidad_amount": None,
-                "key_points": [],
-                "score_delta": 0
-            }
+            return _qualification_defaults(
+                name=_fallback.get("name"),
+                phone=_fallback.get("phone"),
+                email=_fallback.get("email"),
+            )
 
     @staticmethod
     async def generate_response_with_function_calling(
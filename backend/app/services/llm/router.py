@@ -20,6 +20,8 @@ Error hierarchy handled:
 import logging
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import httpx
+
 from app.services.llm.base_provider import (
     BaseLLMProvider,
     LLMMessage,
@@ -30,24 +32,27 @@ from app.services.llm.base_provider import (
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# Retriable exception types (imported lazily to avoid hard dependencies)
+# Retriable exception types (provider SDKs imported lazily to avoid hard dependencies)
 # ---------------------------------------------------------------------------
 
+# httpx network errors (shared by all providers)
+_RETRIABLE_EXC_TUPLE: Tuple[type, ...] = (
+    httpx.TimeoutException,
+    httpx.ConnectError,
+    httpx.ReadError,
+    httpx.RemoteProtocolError,
+)
+
+
 def _is_retriable(exc: Exception) -> bool:
     """
     Return True if the exception represents a transient error worth retrying.
     Checks known exception types from all supported providers.
     """
-    exc_type = type(exc)
-    exc_module = exc_type.__module__ or ""
+    if isinstance(exc, _RETRIABLE_EXC_TUPLE):
+        return True
 
-    # httpx network errors (shared by all providers)
-    try:
-        import httpx
-        if isinstance(exc, (httpx.TimeoutException, httpx.ConnectError, httpx.RemoteProtocolError)):
-            return True
-    except ImportError:
-        pass
+    exc_module = type(exc).__module__ or ""
 
     # Google Gemini errors
     if "google" in exc_module:
@@ -154,6 +159,8 @@ class LLMRouter(BaseLLMProvider):
 
         primary_provider = self.primary
         fallback_provider = self.fallback
+        # Resolved once per call (not per retry attempt), from the current provider
+        method = getattr(primary_provider, method_name)
 
         # ── Step 1: try primary with backoff ─────────────────────────────────
         last_primary_exc: Optional[Exception] = None
@@ -165,7 +172,6 @@ class LLMRouter(BaseLLMProvider):
                 reraise=False,
             ):
                 with attempt:
-                    method = getattr(primary_provider, method_name)
                     result = await call_async_protected(llm_breaker, method, *args, **kwargs)
 
             # Success on primary
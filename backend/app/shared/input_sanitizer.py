@@ -18,6 +18,7 @@ Usage:
 """
 import logging
 import re
+import sys
 import unicodedata
 from dataclasses import dataclass
 from typing import Optional
@@ -48,11 +49,62 @@ _INJECTION_PATTERNS: list[tuple[str, str]] = [
     (r"(?-i:\bDAN\b)", "DAN jailbreak — solo mayúsculas"),
 ]
 
-# Compile patterns once at module load
-_COMPILED_PATTERNS = [
-    (re.compile(pattern, re.IGNORECASE | re.DOTALL), description)
-    for pattern, description in _INJECTION_PATTERNS
-]
+_REGEX_FLAGS = re.IGNORECASE | re.DOTALL
+
+
+def _build_injection_re(
+    patterns: list[tuple[str, str]],
+) -> tuple[re.Pattern, dict[str, str]]:
+    """
+    Fold every pattern into one alternation compiled at module load, so a
+    message is scanned in a single pass instead of once per pattern. Each
+    pattern gets a named group; the group that matched identifies it.
+
+    Patterns are validated one by one first: an invalid entry is logged and
+    skipped instead of breaking the import of this module.
+    """
+    groups: list[str] = []
+    descriptions: dict[str, str] = {}
+    for i, (pattern, description) in enumerate(patterns):
+        group = f"(?P<p{i}>{pattern})"
+        try:
+            re.compile(group, _REGEX_FLAGS)
+        except re.error as exc:
+            logger.error(
+                "[InputSanitizer] Skipping invalid injection pattern %r: %s",
+                pattern, exc,
+            )
+            continue
+        groups.append(group)
+        descriptions[f"p{i}"] = description
+    # An empty alternation would match everything; (?!) never matches.
+    return re.compile("|".join(groups) or "(?!)", _REGEX_FLAGS), descriptions
+
+
+_INJECTION_RE, _PATTERN_DESCRIPTIONS = _build_injection_re(_INJECTION_PATTERNS)
+
+# Cheap pre-check: every pattern above needs one of these literal substrings
+# (case-insensitive), so a message containing none of them cannot match and
+# skips the regex scan. Keep this in sync when adding patterns.
+_QUICK_TRIGGERS: tuple[str, ...] = (
+    "system",   # [system], <system>, --- SYSTEM ---
+    "---",      # separator injection
+    "[inst]",
+    "<<sys>>",
+    "prompt",   # prompt exfiltration
+    "jailbreak",
+)
+_QUICK_TRIGGERS_CASE_SENSITIVE: tuple[str, ...] = ("DAN",)
+
+# Non-ASCII letters that re.IGNORECASE treats as equal to ASCII ones but that
+# str.lower() leaves alone (or expands); fold them so the pre-check cannot be
+# sidestepped with e.g. "[ſystem]".
+_IGNORECASE_FOLD = str.maketrans({
+    "\u0130": "i",  # LATIN CAPITAL LETTER I WITH DOT ABOVE
+    "\u0131": "i",  # LATIN SMALL LETTER DOTLESS I
+    "\u017f": "s",  # LATIN SMALL LETTER LONG S
+    "\u212a": "k",  # KELVIN SIGN
+})
 
 
 # ---------------------------------------------------------------------------
@@ -71,7 +123,7 @@ class InputSanitizationError(ValueError):
 # Sanitization result
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SanitizedMessage:
     """Holds the cleaned message and any metadata about transformations."""
     text: str
@@ -120,7 +172,9 @@ def sanitize_chat_input(
 
     # Step 2: Strip leading / trailing whitespace
     stripped = cleaned.strip()
-    was_stripped = stripped != message
+    # Both steps only delete characters, so a length change is enough to
+    # tell whether anything was removed (no second full-string comparison).
+    was_stripped = len(stripped) != original_length
 
     # Step 3: Empty message check
     if not stripped:
@@ -162,30 +216,51 @@ def sanitize_chat_input(
 # Internal helpers
 # ---------------------------------------------------------------------------
 
+def _build_control_char_table() -> dict[int, None]:
+    """
+    str.translate table that deletes unicode control characters.
+
+    Only the ~2.3k code points to delete are stored; str.translate leaves
+    unmapped characters untouched at C level, so the table never grows and
+    emoji / CJK text costs no Python-level lookups.
+    """
+    # Cc = control, Cf = format, Cs = surrogate
+    stripped_categories = {"Cc", "Cf", "Cs"}
+    allowed = set(map(ord, "\n\r\t"))
+    return dict.fromkeys(
+        cp
+        for cp in range(sys.maxunicode + 1)
+        if cp not in allowed and unicodedata.category(chr(cp)) in stripped_categories
+    )
+
+
+_CONTROL_CHAR_TABLE = _build_control_char_table()
+
+
 def _strip_control_characters(text: str) -> str:
     """
     Remove unicode control characters while preserving:
       - Regular whitespace (space, tab, newline, carriage return)
       - All printable characters
     """
-    allowed_control = {"\n", "\r", "\t"}
-
-    def _keep(char: str) -> bool:
-        if char in allowed_control:
-            return True
-        category = unicodedata.category(char)
-        # Cc = control, Cf = format, Cs = surrogate
-        return category not in ("Cc", "Cf", "Cs")
-
-    return "".join(c for c in text if _keep(c))
+    return text.translate(_CONTROL_CHAR_TABLE)
 
 
 def _detect_injection(text: str) -> Optional[str]:
     """
     Check text against known injection patterns.
-    Returns the description of the first match, or None.
+    Returns the description of the leftmost match, or None.
     """
-    for pattern, description in _COMPILED_PATTERNS:
-        if pattern.search(text):
-            return description
-    return None
+    # The fold table only maps non-ASCII characters
+    if text.isascii():
+        lowered = text.lower()
+    else:
+        lowered = text.translate(_IGNORECASE_FOLD).lower()
+    if not any(t in lowered for t in _QUICK_TRIGGERS) and not any(
+        t in text for t in _QUICK_TRIGGERS_CASE_SENSITIVE
+    ):
+        return None
+    match = _INJECTION_RE.search(text)
+    if match is None:
+        return None
+    return _PATTERN_DESCRIPTIONS[match.lastgroup]
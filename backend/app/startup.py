@@ -51,14 +51,15 @@ def run() -> None:
 
 def _ensure_extensions(engine) -> None:
     from sqlalchemy import create_engine, text
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("COMMIT"))
-            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-            conn.execute(text("COMMIT"))
-        log.info("vector extension OK")
-    except Exception as exc:
-        log.warning("vector extension skipped: %s", exc)
+    for extension in ("vector", "pg_trgm"):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("COMMIT"))
+                conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+                conn.execute(text("COMMIT"))
+            log.info("%s extension OK", extension)
+        except Exception as exc:
+            log.warning("%s extension skipped: %s", extension, exc)
 
 
 def _run_migrations() -> None:
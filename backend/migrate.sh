@@ -1,7 +1,7 @@
 #!/bin/sh
 set -e
 
-echo "=== Ensuring pgvector extension ==="
+echo "=== Ensuring pgvector and pg_trgm extensions ==="
 python3 -c "
 import os
 from sqlalchemy import create_engine, text
@@ -10,7 +10,8 @@ url = raw_url.replace('postgresql+asyncpg://', 'postgresql://').replace('postgre
 engine = create_engine(url)
 with engine.begin() as conn:
     conn.execute(text('CREATE EXTENSION IF NOT EXISTS vector'))
-print('Extension OK')
+    conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+print('Extensions OK')
 "
 
 echo "=== Running migrations ==="
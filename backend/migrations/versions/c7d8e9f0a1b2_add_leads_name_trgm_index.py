@@ -0,0 +1,32 @@
+"""add pg_trgm GIN index on leads.name
+
+Revision ID: c7d8e9f0a1b2
+Revises: merge_heads_deals_projects
+Create Date: 2026-10-18
+
+Lead search filters with ``Lead.name.ilike('%term%')`` (lead_service,
+pipeline metrics). A leading wildcard can't use a btree index, so every
+search was a sequential scan over leads; a trigram GIN index serves it.
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = 'c7d8e9f0a1b2'
+down_revision: Union[str, Sequence[str], None] = 'merge_heads_deals_projects'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_leads_name_trgm "
+            "ON leads USING gin (name gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_leads_name_trgm")
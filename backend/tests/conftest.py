@@ -9,11 +9,13 @@ This file contains reusable fixtures for:
 """
 import pytest
 import asyncio
+from functools import lru_cache
 from typing import AsyncGenerator, Generator
 from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
@@ -21,6 +23,7 @@ from app.database import get_db
 from app.models.base import Base
 from app.middleware.auth import create_access_token, hash_password
 from app.models.user import User, UserRole
+from app.models.lead import Lead, LeadStatus
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.types import JSON, String
 from sqlalchemy.ext.compiler import compiles
@@ -40,7 +43,8 @@ def compile_now_sqlite(element, compiler, **kw):
     return "datetime('now')"
 
 
-# Use SQLite for testing (in-memory)
+# Use SQLite for testing (in-memory). Each pytest-xdist worker is its own
+# process, so `pytest -n auto` gets one private database per worker.
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
@@ -52,57 +56,87 @@ def event_loop() -> Generator:
     loop.close()
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 async def test_engine():
-    """Create async test engine"""
+    """Create the in-memory test engine and schema once per session"""
     engine = create_async_engine(
         TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
         echo=False
     )
-    
+
+    # pysqlite defers BEGIN and ignores SAVEPOINT semantics; emit BEGIN
+    # ourselves so per-test savepoints roll back cleanly.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    
+
     yield engine
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    
+
     await engine.dispose()
 
 
 @pytest.fixture(scope="function")
 async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session"""
-    async_session = async_sessionmaker(
-        test_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-        autocommit=False
-    )
-    
-    async with async_session() as session:
-        yield session
-        await session.rollback()
+    """
+    Create a test database session isolated in an outer transaction.
+
+    session.commit() only releases a SAVEPOINT, so every write made by the
+    test is discarded when the outer transaction rolls back on teardown.
+    """
+    async with test_engine.connect() as conn:
+        outer = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await outer.rollback()
+
+
+def pytest_collection_modifyitems(config, items):
+    """Tag every test that (directly or via another fixture) needs db_session."""
+    for item in items:
+        if "db_session" in getattr(item, "fixturenames", ()):
+            item.add_marker(pytest.mark.db)
+
+
+@pytest.fixture(scope="session")
+async def asgi_client() -> AsyncGenerator[AsyncClient, None]:
+    """One ASGI-backed AsyncClient (and connection pool) shared by the session"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
 
 
 @pytest.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create async test client with overridden database dependency"""
-    
+async def client(
+    asgi_client: AsyncClient, db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Shared async test client with get_db bound to this test's db_session"""
+
     async def override_get_db():
         yield db_session
-    
+
     app.dependency_overrides[get_db] = override_get_db
-    
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
-        yield ac
-    
-    app.dependency_overrides.clear()
+    asgi_client.cookies.clear()
+    try:
+        yield asgi_client
+    finally:
+        app.dependency_overrides.clear()
 
 
 @pytest.fixture(scope="function")
@@ -120,12 +154,18 @@ def sync_client(db_session: AsyncSession) -> Generator[TestClient, None, None]:
     app.dependency_overrides.clear()
 
 
+@lru_cache(maxsize=None)
+def _password_hash(plain: str) -> str:
+    """bcrypt is deliberately slow; hash each test password once per session"""
+    return hash_password(plain)
+
+
 @pytest.fixture
 async def test_user(db_session: AsyncSession) -> User:
     """Create a test user in the database"""
     user = User(
         email="test@example.com",
-        hashed_password=hash_password("testpassword123"),
+        hashed_password=_password_hash("testpassword123"),
         role=UserRole.ADMIN,
         broker_id=None,
         name="Test User"
@@ -136,9 +176,26 @@ async def test_user(db_session: AsyncSession) -> User:
     return user
 
 
+@pytest.fixture
+async def test_lead(db_session: AsyncSession) -> Lead:
+    """Create a web-chat lead directly, skipping a chat round-trip"""
+    lead = Lead(
+        phone="web_chat_pending",
+        tags=["test", "chat", "web_chat"],
+        status=LeadStatus.COLD,
+        lead_score=0.0,
+    )
+    db_session.add(lead)
+    await db_session.commit()
+    await db_session.refresh(lead)
+    return lead
+
+
 @pytest.fixture
 def auth_headers(test_user: User) -> dict:
     """Create authentication headers for a test user"""
+    # Minted per test: tokens carry an exp, so caching them across the
+    # session breaks long runs and freeze_time tests.
     token = create_access_token(
         data={
             "sub": str(test_user.id),
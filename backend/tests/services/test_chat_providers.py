@@ -2,13 +2,52 @@
 Unit tests for chat providers (Telegram, WhatsApp).
 """
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.services.chat.base_provider import ChatMessageData, SendMessageResult
 from app.services.chat.telegram_provider import TelegramProvider
 from app.services.chat.whatsapp_provider import WhatsAppProvider
 from app.services.chat.factory import ChatProviderFactory
 
+# Inbound webhook payloads are read-only for the parsers; build them once.
+TG_TEXT_PAYLOAD = {
+    "update_id": 123,
+    "message": {
+        "message_id": 456,
+        "from": {"id": 789, "username": "testuser"},
+        "chat": {"id": 789},
+        "text": "Hello",
+        "date": 1234567890,
+    },
+}
+
+WA_TEXT_PAYLOAD = {
+    "object": "whatsapp_business_account",
+    "entry": [
+        {
+            "id": "bid",
+            "changes": [
+                {
+                    "value": {
+                        "messaging_product": "whatsapp",
+                        "metadata": {"phone_number_id": "123"},
+                        "messages": [
+                            {
+                                "from": "5491112345678",
+                                "id": "wamid.xxx",
+                                "timestamp": "1234567890",
+                                "type": "text",
+                                "text": {"body": "Hello"},
+                            }
+                        ],
+                    },
+                    "field": "messages",
+                }
+            ],
+        }
+    ],
+}
+
 
 class TestTelegramProvider:
     """Tests for TelegramProvider."""
@@ -19,17 +58,7 @@ class TestTelegramProvider:
 
     @pytest.mark.asyncio
     async def test_parse_webhook_message_text(self, provider):
-        payload = {
-            "update_id": 123,
-            "message": {
-                "message_id": 456,
-                "from": {"id": 789, "username": "testuser"},
-                "chat": {"id": 789},
-                "text": "Hello",
-                "date": 1234567890,
-            },
-        }
-        result = await provider.parse_webhook_message(payload)
+        result = await provider.parse_webhook_message(TG_TEXT_PAYLOAD)
         assert result is not None
         assert isinstance(result, ChatMessageData)
         assert result.channel_user_id == "789"
@@ -59,13 +88,11 @@ class TestTelegramProvider:
     @pytest.mark.asyncio
     async def test_send_message_success(self, provider):
         with patch("app.services.chat.telegram_provider.httpx.AsyncClient") as mock_client:
-            mock_response = AsyncMock()
-            mock_response.status_code = 200
-            mock_response.json.return_value = {"ok": True, "result": {"message_id": 999}}
-            mock_response.text = "{}"
+            # httpx.Response.json() is sync; only client.post needs to be awaitable
+            mock_response = MagicMock(status_code=200, text="{}")
+            mock_response.json = MagicMock(return_value={"ok": True, "result": {"message_id": 999}})
             mock_post = AsyncMock(return_value=mock_response)
-            inst = AsyncMock()
-            inst.post = mock_post
+            inst = MagicMock(post=mock_post)
             mock_client.return_value.__aenter__.return_value = inst
             mock_client.return_value.__aexit__.return_value = None
 
@@ -90,33 +117,7 @@ class TestWhatsAppProvider:
 
     @pytest.mark.asyncio
     async def test_parse_webhook_message_text(self, provider):
-        payload = {
-            "object": "whatsapp_business_account",
-            "entry": [
-                {
-                    "id": "bid",
-                    "changes": [
-                        {
-                            "value": {
-                                "messaging_product": "whatsapp",
-                                "metadata": {"phone_number_id": "123"},
-                                "messages": [
-                                    {
-                                        "from": "5491112345678",
-                                        "id": "wamid.xxx",
-                                        "timestamp": "1234567890",
-                                        "type": "text",
-                                        "text": {"body": "Hello"},
-                                    }
-                                ],
-                            },
-                            "field": "messages",
-                        }
-                    ],
-                }
-            ],
-        }
-        result = await provider.parse_webhook_message(payload)
+        result = await provider.parse_webhook_message(WA_TEXT_PAYLOAD)
         assert result is not None
         assert result.channel_user_id == "5491112345678"
         assert result.message_text == "Hello"
@@ -161,3 +162,12 @@ class TestChatProviderFactory:
         supported = ChatProviderFactory.get_supported_providers()
         assert "telegram" in supported
         assert "whatsapp" in supported
+
+    def test_get_supported_providers_is_cached_until_register(self, monkeypatch):
+        monkeypatch.setattr(ChatProviderFactory, "_providers", dict(ChatProviderFactory._providers))
+        monkeypatch.setattr(ChatProviderFactory, "_supported_names", None)
+        first = ChatProviderFactory.get_supported_providers()
+        assert ChatProviderFactory.get_supported_providers() is first
+
+        ChatProviderFactory.register_provider("Custom", TelegramProvider)
+        assert "custom" in ChatProviderFactory.get_supported_providers()
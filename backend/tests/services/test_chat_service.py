@@ -15,7 +15,10 @@ class TestChatService:
     @pytest.mark.asyncio
     async def test_get_broker_chat_config_none_when_no_config(self):
         db = AsyncMock()
-        db.execute = AsyncMock(return_value=MagicMock(scalar_one_or_none=AsyncMock(return_value=None)))
+        # Result.scalars().first() is sync; only db.execute is awaited
+        result = MagicMock()
+        result.scalars.return_value.first.return_value = None
+        db.execute = AsyncMock(return_value=result)
         config = await ChatService.get_broker_chat_config(db, broker_id=1)
         assert config is None
 
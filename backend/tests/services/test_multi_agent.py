@@ -6,8 +6,11 @@ All LLM interactions are mocked.
 """
 from __future__ import annotations
 
+from dataclasses import replace
+from types import SimpleNamespace
+
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 from app.services.agents.types import (
     AgentContext,
@@ -18,7 +21,8 @@ from app.services.agents.types import (
 from app.services.agents.qualifier import QualifierAgent
 from app.services.agents.scheduler import SchedulerAgent
 from app.services.agents.follow_up import FollowUpAgent
-from app.services.agents.supervisor import AgentSupervisor
+from app.services.agents.supervisor import AgentSupervisor, _MAX_HANDOFFS
+from app.services.llm.facade import LLMServiceFacade
 from app.services.agents import (
     build_context,
     get_priority_agents,
@@ -45,60 +49,107 @@ def _new_lead_context(**overrides) -> AgentContext:
     return AgentContext(**defaults)
 
 
+_QUALIFIED_LEAD_DATA = {
+    "broker_name": "Inmobiliaria Test",
+    "agent_name": "Sofía",
+    "name": "Juan Pérez",
+    "phone": "+56912345678",
+    "salary": "1500000",
+    "location": "Las Condes",
+    "dicom_status": "clean",
+}
+_NO_LOCATION_LEAD_DATA = {k: v for k, v in _QUALIFIED_LEAD_DATA.items() if k != "location"}
+_DIRTY_DICOM_LEAD_DATA = {**_QUALIFIED_LEAD_DATA, "dicom_status": "has_debt"}
+
+
 def _qualified_context() -> AgentContext:
     """Context where all qualification fields are present and DICOM is clean."""
     return _new_lead_context(
         pipeline_stage="perfilamiento",
         conversation_state="FINANCIAL_QUAL",
-        lead_data={
-            "broker_name": "Inmobiliaria Test",
-            "agent_name": "Sofía",
-            "name": "Juan Pérez",
-            "phone": "+56912345678",
-            "salary": "1500000",
-            "location": "Las Condes",
-            "dicom_status": "clean",
-        },
+        lead_data=dict(_QUALIFIED_LEAD_DATA),
     )
 
 
-def _dirty_dicom_context() -> AgentContext:
+@pytest.fixture(scope="session")
+def base_new_ctx() -> AgentContext:
+    """Canonical new-lead context; derive variants with dataclasses.replace."""
+    return _new_lead_context()
+
+
+@pytest.fixture(scope="session")
+def base_qualified_ctx() -> AgentContext:
+    return _qualified_context()
+
+
+@pytest.fixture(scope="session")
+def dirty_dicom_ctx(base_qualified_ctx) -> AgentContext:
     """Context where lead has dirty DICOM — no handoff should happen."""
-    ctx = _qualified_context()
-    ctx.lead_data = {**ctx.lead_data, "dicom_status": "has_debt"}
-    return ctx
+    return replace(base_qualified_ctx, lead_data=dict(_DIRTY_DICOM_LEAD_DATA))
+
+
+@pytest.fixture(scope="module")
+def qualifier() -> QualifierAgent:
+    """Agents are stateless, so one instance serves the whole module."""
+    return QualifierAgent()
+
+
+@pytest.fixture(scope="module")
+def scheduler() -> SchedulerAgent:
+    return SchedulerAgent()
+
+
+@pytest.fixture
+def llm_mocks(monkeypatch) -> SimpleNamespace:
+    """Install AsyncMocks on LLMServiceFacade; tests set return_value / side_effect."""
+    analyze = AsyncMock()
+    generate = AsyncMock()
+    monkeypatch.setattr(LLMServiceFacade, "analyze_lead_qualification", analyze)
+    monkeypatch.setattr(LLMServiceFacade, "generate_response_with_function_calling", generate)
+    return SimpleNamespace(analyze=analyze, generate=generate)
+
+
+@pytest.fixture
+def agent_doubles(monkeypatch) -> SimpleNamespace:
+    """Install AsyncMocks on the singleton agents the supervisor dispatches to."""
+    qualifier_process = AsyncMock()
+    scheduler_process = AsyncMock()
+    monkeypatch.setattr(qualifier_agent_instance, "process", qualifier_process)
+    monkeypatch.setattr(scheduler_agent_instance, "process", scheduler_process)
+    monkeypatch.setattr(
+        scheduler_agent_instance, "should_handle", AsyncMock(return_value=True)
+    )
+    return SimpleNamespace(
+        qualifier_process=qualifier_process, scheduler_process=scheduler_process
+    )
 
 
 # ── AgentContext tests ────────────────────────────────────────────────────────
 
 class TestAgentContext:
-    def test_is_qualified_true_when_all_fields_present(self):
-        ctx = _qualified_context()
-        assert ctx.is_qualified()
-
-    def test_is_qualified_false_when_missing_name(self):
-        ctx = _new_lead_context(lead_data={"phone": "+56912345678", "salary": "1M"})
-        assert not ctx.is_qualified()
-
-    def test_is_qualified_false_with_dirty_dicom(self):
-        ctx = _dirty_dicom_context()
-        assert not ctx.is_qualified()
-
-    def test_is_appointment_ready_requires_location(self):
-        ctx = _qualified_context()
-        ctx_no_location = AgentContext(
-            lead_id=ctx.lead_id,
-            broker_id=ctx.broker_id,
-            pipeline_stage=ctx.pipeline_stage,
-            conversation_state=ctx.conversation_state,
-            lead_data={k: v for k, v in ctx.lead_data.items() if k != "location"},
-            message_history=[],
-        )
-        assert not ctx_no_location.is_appointment_ready()
-        assert ctx.is_appointment_ready()
+    @pytest.mark.parametrize(
+        "lead_data, predicate, expected",
+        [
+            (_QUALIFIED_LEAD_DATA, "is_qualified", True),
+            ({"phone": "+56912345678", "salary": "1M"}, "is_qualified", False),
+            (_DIRTY_DICOM_LEAD_DATA, "is_qualified", False),
+            (_QUALIFIED_LEAD_DATA, "is_appointment_ready", True),
+            (_NO_LOCATION_LEAD_DATA, "is_appointment_ready", False),
+        ],
+        ids=[
+            "qualified",
+            "missing-name",
+            "dirty-dicom",
+            "appointment-ready",
+            "appointment-needs-location",
+        ],
+    )
+    def test_context_predicates(self, base_new_ctx, lead_data, predicate, expected):
+        ctx = replace(base_new_ctx, lead_data=lead_data)
+        assert bool(getattr(ctx, predicate)()) is expected
 
-    def test_missing_fields_lists_uncollected_data(self):
-        ctx = _new_lead_context(lead_data={"name": "Juan"})
+    def test_missing_fields_lists_uncollected_data(self, base_new_ctx):
+        ctx = replace(base_new_ctx, lead_data={"name": "Juan"})
         missing = ctx.missing_fields()
         assert "teléfono" in missing
         assert "renta / presupuesto" in missing
@@ -109,45 +160,38 @@ class TestAgentContext:
 
 class TestQualifierAgent:
     @pytest.mark.asyncio
-    async def test_should_handle_new_lead(self):
-        agent = QualifierAgent()
-        ctx = _new_lead_context()
-        assert await agent.should_handle(ctx)
+    async def test_should_handle_new_lead(self, qualifier, base_new_ctx):
+        assert await qualifier.should_handle(base_new_ctx)
 
     @pytest.mark.asyncio
-    async def test_should_handle_perfilamiento_stage(self):
-        agent = QualifierAgent()
-        ctx = _new_lead_context(pipeline_stage="perfilamiento")
-        assert await agent.should_handle(ctx)
+    async def test_should_handle_perfilamiento_stage(self, qualifier, base_new_ctx):
+        ctx = replace(base_new_ctx, pipeline_stage="perfilamiento")
+        assert await qualifier.should_handle(ctx)
 
     @pytest.mark.asyncio
-    async def test_should_not_handle_agendado_stage(self):
-        agent = QualifierAgent()
-        ctx = _new_lead_context(
+    async def test_should_not_handle_agendado_stage(self, qualifier, base_new_ctx):
+        ctx = replace(
+            base_new_ctx,
             pipeline_stage="agendado",
             conversation_state="SCHEDULING",
             current_agent=AgentType.SCHEDULER,
         )
-        assert not await agent.should_handle(ctx)
+        assert not await qualifier.should_handle(ctx)
 
-    def test_system_prompt_contains_agent_name(self):
-        agent = QualifierAgent()
-        ctx = _new_lead_context(lead_data={"agent_name": "Lucía", "broker_name": "Activa"})
-        prompt = agent.get_system_prompt(ctx)
+    def test_system_prompt_contains_agent_name(self, qualifier, base_new_ctx):
+        ctx = replace(base_new_ctx, lead_data={"agent_name": "Lucía", "broker_name": "Activa"})
+        prompt = qualifier.get_system_prompt(ctx)
         assert "Lucía" in prompt
         assert "Activa" in prompt
 
-    def test_system_prompt_contains_dicom_rule(self):
-        agent = QualifierAgent()
-        ctx = _new_lead_context()
-        prompt = agent.get_system_prompt(ctx)
+    def test_system_prompt_contains_dicom_rule(self, qualifier, base_new_ctx):
+        prompt = qualifier.get_system_prompt(base_new_ctx)
         assert "DICOM" in prompt
         assert "CRÍTICA" in prompt.upper() or "crítica" in prompt.lower()
 
     @pytest.mark.asyncio
-    async def test_process_emits_handoff_when_qualified(self):
-        agent = QualifierAgent()
-        ctx = _qualified_context()
+    async def test_process_emits_handoff_when_qualified(self, qualifier, base_qualified_ctx, llm_mocks):
+        ctx = base_qualified_ctx
 
         mock_analysis = {
             "name": "Juan Pérez",
@@ -163,104 +207,70 @@ class TestQualifierAgent:
                 await tool_executor("handoff_to_scheduler", {"reason": "Lead calificado"})
             return ("¡Perfecto, Juan! Ya tenemos todo. ¿Cuándo te viene bien visitar?", [])
 
-        with (
-            patch(
-                "app.services.llm.facade.LLMServiceFacade.analyze_lead_qualification",
-                AsyncMock(return_value=mock_analysis),
-            ),
-            patch(
-                "app.services.llm.facade.LLMServiceFacade.generate_response_with_function_calling",
-                side_effect=mock_generate,
-            ),
-        ):
-            db = MagicMock()
-            response = await agent.process("Tengo DICOM limpio", ctx, db)
+        llm_mocks.analyze.return_value = mock_analysis
+        llm_mocks.generate.side_effect = mock_generate
+
+        db = MagicMock()
+        response = await qualifier.process("Tengo DICOM limpio", ctx, db)
 
         assert response.agent_type == AgentType.QUALIFIER
         assert response.handoff is not None
         assert response.handoff.target_agent == AgentType.SCHEDULER
 
     @pytest.mark.asyncio
-    async def test_process_no_handoff_with_dirty_dicom(self):
-        agent = QualifierAgent()
-        ctx = _dirty_dicom_context()
+    async def test_process_no_handoff_with_dirty_dicom(self, qualifier, dirty_dicom_ctx, llm_mocks):
+        ctx = dirty_dicom_ctx
 
         mock_analysis = {"dicom_status": "has_debt"}
         mock_response = ("Entiendo. Para acceder al crédito necesitas DICOM limpio.", [])
 
-        with (
-            patch(
-                "app.services.llm.facade.LLMServiceFacade.analyze_lead_qualification",
-                AsyncMock(return_value=mock_analysis),
-            ),
-            patch(
-                "app.services.llm.facade.LLMServiceFacade.generate_response_with_function_calling",
-                AsyncMock(return_value=mock_response),
-            ),
-        ):
-            db = MagicMock()
-            response = await agent.process("Tengo DICOM activo", ctx, db)
+        llm_mocks.analyze.return_value = mock_analysis
+        llm_mocks.generate.return_value = mock_response
+
+        db = MagicMock()
+        response = await qualifier.process("Tengo DICOM activo", ctx, db)
 
         assert response.handoff is None, "Should NOT handoff when DICOM is dirty"
 
     @pytest.mark.asyncio
-    async def test_process_graceful_on_llm_error(self):
-        agent = QualifierAgent()
-        ctx = _new_lead_context()
-
-        with (
-            patch(
-                "app.services.llm.facade.LLMServiceFacade.analyze_lead_qualification",
-                AsyncMock(side_effect=Exception("LLM timeout")),
-            ),
-            patch(
-                "app.services.llm.facade.LLMServiceFacade.generate_response_with_function_calling",
-                AsyncMock(side_effect=Exception("LLM timeout")),
-            ),
-        ):
-            db = MagicMock()
-            response = await agent.process("Hola", ctx, db)
+    async def test_process_graceful_on_llm_error(self, qualifier, base_new_ctx, llm_mocks):
+        ctx = base_new_ctx
+
+        # Analysis and response generation each catch their own failure, so
+        # both facade calls run; one shared exception covers the two paths.
+        llm_mocks.analyze.side_effect = llm_mocks.generate.side_effect = Exception("LLM timeout")
+
+        db = MagicMock()
+        response = await qualifier.process("Hola", ctx, db)
 
         # Should not raise — returns graceful message
         assert response.message
         assert response.agent_type == AgentType.QUALIFIER
+        llm_mocks.analyze.assert_awaited_once()
+        llm_mocks.generate.assert_awaited_once()
 
 
 # ── SchedulerAgent ────────────────────────────────────────────────────────────
 
 class TestSchedulerAgent:
     @pytest.mark.asyncio
-    async def test_should_handle_calificacion_stage(self):
-        agent = SchedulerAgent()
-        ctx = _new_lead_context(pipeline_stage="calificacion_financiera")
-        assert await agent.should_handle(ctx)
+    async def test_should_handle_calificacion_stage(self, scheduler, base_new_ctx):
+        ctx = replace(base_new_ctx, pipeline_stage="calificacion_financiera")
+        assert await scheduler.should_handle(ctx)
 
     @pytest.mark.asyncio
-    async def test_should_handle_after_qualifier_handoff(self):
-        agent = SchedulerAgent()
-        ctx = _qualified_context()
-        ctx_with_agent = AgentContext(
-            lead_id=ctx.lead_id,
-            broker_id=ctx.broker_id,
-            pipeline_stage=ctx.pipeline_stage,
-            conversation_state=ctx.conversation_state,
-            lead_data=ctx.lead_data,
-            message_history=[],
-            current_agent=AgentType.QUALIFIER,
-        )
-        assert await agent.should_handle(ctx_with_agent)
+    async def test_should_handle_after_qualifier_handoff(self, scheduler, base_qualified_ctx):
+        ctx_with_agent = replace(base_qualified_ctx, current_agent=AgentType.QUALIFIER)
+        assert await scheduler.should_handle(ctx_with_agent)
 
-    def test_system_prompt_contains_lead_info(self):
-        agent = SchedulerAgent()
-        ctx = _qualified_context()
-        prompt = agent.get_system_prompt(ctx)
+    def test_system_prompt_contains_lead_info(self, scheduler, base_qualified_ctx):
+        prompt = scheduler.get_system_prompt(base_qualified_ctx)
         assert "Juan Pérez" in prompt
         assert "Las Condes" in prompt
 
     @pytest.mark.asyncio
-    async def test_process_signals_handoff_when_appointment_confirmed(self):
-        agent = SchedulerAgent()
-        ctx = _qualified_context()
+    async def test_process_signals_handoff_when_appointment_confirmed(self, scheduler, base_qualified_ctx, llm_mocks):
+        ctx = base_qualified_ctx
 
         async def mock_generate(*args, **kwargs):
             # Simulate LLM calling handoff_to_follow_up after appointment created
@@ -269,149 +279,158 @@ class TestSchedulerAgent:
                 await tool_executor("handoff_to_follow_up", {"reason": "Cita agendada exitosamente."})
             return ("¡Confirmado! Te esperamos el sábado a las 10:00.", [])
 
-        with patch(
-            "app.services.llm.facade.LLMServiceFacade.generate_response_with_function_calling",
-            side_effect=mock_generate,
-        ):
-            db = MagicMock()
-            response = await agent.process(
-                "Perfecto, ese horario me acomoda", ctx, db
-            )
+        llm_mocks.generate.side_effect = mock_generate
+
+        db = MagicMock()
+        response = await scheduler.process(
+            "Perfecto, ese horario me acomoda", ctx, db
+        )
 
         assert response.handoff is not None
         assert response.handoff.target_agent == AgentType.FOLLOW_UP
 
     @pytest.mark.asyncio
-    async def test_process_no_handoff_when_not_confirmed(self):
-        agent = SchedulerAgent()
-        ctx = _qualified_context()
+    async def test_process_no_handoff_when_not_confirmed(self, scheduler, base_qualified_ctx, llm_mocks):
+        ctx = base_qualified_ctx
 
         mock_response = ("¿Te acomodaría el sábado a las 10 o el lunes a las 14?", [])
-        with patch(
-            "app.services.llm.facade.LLMServiceFacade.generate_response_with_function_calling",
-            AsyncMock(return_value=mock_response),
-        ):
-            db = MagicMock()
-            response = await agent.process("¿Tienen horario el sábado?", ctx, db)
+        llm_mocks.generate.return_value = mock_response
+
+        db = MagicMock()
+        response = await scheduler.process("¿Tienen horario el sábado?", ctx, db)
 
         assert response.handoff is None
 
 
 # ── AgentSupervisor ───────────────────────────────────────────────────────────
 
+_QUALIFIER_GREETING = AgentResponse(
+    message="¡Hola! ¿Cuál es tu nombre?",
+    agent_type=AgentType.QUALIFIER,
+)
+_SCHEDULER_GREETING = AgentResponse(
+    message="¡Hola! ¿Cuándo te viene bien visitarnos?",
+    agent_type=AgentType.SCHEDULER,
+)
+_QUAL_TO_SCHED_HANDOFF = AgentResponse(
+    message="¡Perfecto! Ahora te paso con nuestra asesora de visitas.",
+    agent_type=AgentType.QUALIFIER,
+    handoff=HandoffSignal(
+        target_agent=AgentType.SCHEDULER,
+        reason="All fields collected, DICOM clean.",
+    ),
+)
+_QUAL_SELF_HANDOFF = AgentResponse(
+    message="Still routing...",
+    agent_type=AgentType.QUALIFIER,
+    handoff=HandoffSignal(
+        target_agent=AgentType.QUALIFIER,  # routes back to itself
+        reason="loop test",
+    ),
+)
+
+
+def _with_fresh_handoff(response: AgentResponse) -> AgentResponse:
+    """The supervisor stamps _handoff_* keys into the signal; don't share them."""
+    return replace(response, handoff=replace(response.handoff, context_updates={}))
+
+
 class TestAgentSupervisor:
     @pytest.mark.asyncio
-    async def test_routes_new_lead_to_qualifier(self):
-        ctx = _new_lead_context()
-        mock_response = AgentResponse(
-            message="¡Hola! ¿Cuál es tu nombre?",
-            agent_type=AgentType.QUALIFIER,
-        )
-        with patch.object(qualifier_agent_instance, "process", AsyncMock(return_value=mock_response)):
-            db = MagicMock()
-            result = await AgentSupervisor.process("Hola", ctx, db)
+    async def test_routes_new_lead_to_qualifier(self, base_new_ctx, agent_doubles):
+        ctx = base_new_ctx
+        agent_doubles.qualifier_process.return_value = _QUALIFIER_GREETING
+        db = MagicMock()
+        result = await AgentSupervisor.process("Hola", ctx, db)
 
         assert result.agent_type == AgentType.QUALIFIER
 
     @pytest.mark.asyncio
-    async def test_executes_handoff_from_qualifier_to_scheduler(self):
+    async def test_executes_handoff_from_qualifier_to_scheduler(
+        self, base_qualified_ctx, agent_doubles
+    ):
         """
         Full POC: QualifierAgent signals handoff → Supervisor routes to SchedulerAgent.
         """
-        ctx = _qualified_context()
-
-        qualifier_response = AgentResponse(
-            message="¡Perfecto! Ahora te paso con nuestra asesora de visitas.",
-            agent_type=AgentType.QUALIFIER,
-            handoff=HandoffSignal(
-                target_agent=AgentType.SCHEDULER,
-                reason="All fields collected, DICOM clean.",
-            ),
-        )
-        scheduler_response = AgentResponse(
-            message="¡Hola! ¿Cuándo te viene bien visitarnos?",
-            agent_type=AgentType.SCHEDULER,
+        ctx = base_qualified_ctx
+
+        agent_doubles.qualifier_process.return_value = _with_fresh_handoff(
+            _QUAL_TO_SCHED_HANDOFF
         )
+        agent_doubles.scheduler_process.return_value = _SCHEDULER_GREETING
 
-        with (
-            patch.object(
-                qualifier_agent_instance,
-                "process",
-                AsyncMock(return_value=qualifier_response),
-            ),
-            patch.object(
-                scheduler_agent_instance,
-                "process",
-                AsyncMock(return_value=scheduler_response),
-            ),
-            patch.object(
-                scheduler_agent_instance,
-                "should_handle",
-                AsyncMock(return_value=True),
-            ),
-        ):
-            db = MagicMock()
-            result = await AgentSupervisor.process(
-                "Tengo todo listo, DICOM limpio", ctx, db
-            )
+        db = MagicMock()
+        result = await AgentSupervisor.process(
+            "Tengo todo listo, DICOM limpio", ctx, db
+        )
 
         # The supervisor should return the Scheduler's response after handoff
         assert result.agent_type == AgentType.SCHEDULER
 
     @pytest.mark.asyncio
-    async def test_no_infinite_loop_on_repeated_handoffs(self):
+    async def test_no_infinite_loop_on_repeated_handoffs(self, base_new_ctx, agent_doubles):
         """Guard: supervisor stops after _MAX_HANDOFFS even if agent keeps signalling."""
-        ctx = _new_lead_context()
-
-        infinite_handoff = AgentResponse(
-            message="Still routing...",
-            agent_type=AgentType.QUALIFIER,
-            handoff=HandoffSignal(
-                target_agent=AgentType.QUALIFIER,  # routes back to itself
-                reason="loop test",
-            ),
+        ctx = base_new_ctx
+
+        agent_doubles.qualifier_process.return_value = _with_fresh_handoff(
+            _QUAL_SELF_HANDOFF
         )
-        with patch.object(qualifier_agent_instance, "process", AsyncMock(return_value=infinite_handoff)):
-            db = MagicMock()
-            # Must not raise; must terminate
-            result = await AgentSupervisor.process("loop me", ctx, db)
+        db = MagicMock()
+        # Must not raise; must terminate
+        result = await AgentSupervisor.process("loop me", ctx, db)
 
         assert result is not None  # returned something
+        assert agent_doubles.qualifier_process.await_count <= _MAX_HANDOFFS
 
 
 # ── Agent registry ────────────────────────────────────────────────────────────
 
+@pytest.fixture(scope="module")
+def priority_agents() -> list:
+    return get_priority_agents()
+
+
 class TestAgentRegistry:
-    def test_all_agents_registered(self):
+    def test_all_agents_registered(self, priority_agents):
         from app.services.agents.base import get_all_agents
         agents = get_all_agents()
         agent_types = {a.agent_type for a in agents}
         assert AgentType.QUALIFIER in agent_types
         assert AgentType.SCHEDULER in agent_types
         assert AgentType.FOLLOW_UP in agent_types
+        assert {a.agent_type for a in priority_agents} <= agent_types
 
-    def test_priority_order(self):
-        agents = get_priority_agents()
-        types = [a.agent_type for a in agents]
+    def test_priority_order(self, priority_agents):
+        types = [a.agent_type for a in priority_agents]
         # FollowUp > Scheduler > Qualifier
         assert types.index(AgentType.FOLLOW_UP) < types.index(AgentType.QUALIFIER)
         assert types.index(AgentType.SCHEDULER) < types.index(AgentType.QUALIFIER)
 
+    def test_get_agent_resolves_singletons_by_type(self):
+        """The supervisor dispatches via a dict keyed by AgentType, not a list scan."""
+        from app.services.agents.base import _AGENT_REGISTRY, get_agent
+        assert isinstance(_AGENT_REGISTRY, dict)
+        assert get_agent(AgentType.QUALIFIER) is qualifier_agent_instance
+        assert get_agent(AgentType.SCHEDULER) is scheduler_agent_instance
+        assert get_agent(AgentType.FOLLOW_UP) is follow_up_agent_instance
+
 
 # ── build_context helper ──────────────────────────────────────────────────────
 
 class TestBuildContext:
     def test_build_context_from_lead_stub(self):
-        lead = MagicMock()
-        lead.id = 42
-        lead.name = "María González"
-        lead.phone = "+56987654321"
-        lead.email = "maria@example.com"
-        lead.lead_metadata = {
-            "pipeline_stage": "perfilamiento",
-            "conversation_state": {"state": "DATA_COLLECTION"},
-            "location": "Ñuñoa",
-        }
+        lead = SimpleNamespace(
+            id=42,
+            name="María González",
+            phone="+56987654321",
+            email="maria@example.com",
+            pipeline_stage=None,  # fall back to the stage stored in metadata
+            lead_metadata={
+                "pipeline_stage": "perfilamiento",
+                "conversation_state": {"state": "DATA_COLLECTION"},
+                "location": "Ñuñoa",
+            },
+        )
 
         ctx = build_context(lead, broker_id=5)
 
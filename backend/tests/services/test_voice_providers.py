@@ -18,6 +18,39 @@ from app.services.voice.providers.vapi.provider import VapiProvider
 from app.services.voice.providers.bland.provider import BlandProvider
 from app.services.voice.call_service import _webhook_event_to_legacy
 
+# Webhook payloads are only read by handle_webhook; build them once per module.
+_VAPI_STATUS_PAYLOAD = {
+    "message": {
+        "type": "status-update",
+        "status": "ended",
+        "call": {
+            "id": "vapi-call-1",
+            "status": "ended",
+            "startedAt": "2025-02-21T10:00:00Z",
+            "endedAt": "2025-02-21T10:02:00Z",
+            "recordingUrl": "https://example.com/rec",
+            "transcript": "Full transcript",
+            "summary": "Call summary",
+        },
+    },
+}
+
+_VAPI_TRANSCRIPT_PAYLOAD = {
+    "message": {
+        "type": "transcript",
+        "transcript": "Partial line",
+        "call": {"id": "vapi-call-2"},
+    },
+}
+
+_BLAND_COMPLETED_PAYLOAD = {
+    "call_id": "bland-call-1",
+    "status": "completed",
+    "transcript": "Bland transcript",
+    "call_length": 90,
+    "recording_url": "https://bland.com/rec",
+}
+
 
 class TestVoiceTypes:
     def test_voice_provider_type_values(self):
@@ -44,101 +77,76 @@ class TestVoiceTypes:
 
 
 class TestFactory:
-    @pytest.mark.asyncio
-    async def test_get_voice_provider_default_returns_vapi(self):
-        provider = await get_voice_provider()
-        assert isinstance(provider, VapiProvider)
-
-    @pytest.mark.asyncio
-    async def test_get_voice_provider_by_type_vapi(self):
-        provider = await get_voice_provider(provider_type="vapi")
-        assert isinstance(provider, VapiProvider)
-
-    @pytest.mark.asyncio
-    async def test_get_voice_provider_by_type_bland(self):
-        provider = await get_voice_provider(provider_type="bland")
-        assert isinstance(provider, BlandProvider)
-
-    @pytest.mark.asyncio
-    async def test_get_voice_provider_unknown_falls_back_to_vapi(self):
-        provider = await get_voice_provider(provider_type="unknown")
-        assert isinstance(provider, VapiProvider)
-
-
-class TestVapiWebhookNormalization:
-    @pytest.mark.asyncio
-    async def test_vapi_status_update_maps_to_webhook_event(self):
-        provider = VapiProvider()
-        payload = {
-            "message": {
-                "type": "status-update",
-                "status": "ended",
-                "call": {
-                    "id": "vapi-call-1",
-                    "status": "ended",
-                    "startedAt": "2025-02-21T10:00:00Z",
-                    "endedAt": "2025-02-21T10:02:00Z",
-                    "recordingUrl": "https://example.com/rec",
+    @pytest.mark.parametrize(
+        "provider_type, expected_cls",
+        [
+            (None, VapiProvider),
+            ("vapi", VapiProvider),
+            ("bland", BlandProvider),
+            ("unknown", VapiProvider),
+        ],
+        ids=["default", "vapi", "bland", "unknown-falls-back-to-vapi"],
+    )
+    async def test_get_voice_provider(self, provider_type, expected_cls):
+        kwargs = {} if provider_type is None else {"provider_type": provider_type}
+        provider = await get_voice_provider(**kwargs)
+        assert isinstance(provider, expected_cls)
+
+
+class TestWebhookNormalization:
+    @pytest.mark.parametrize(
+        "provider_cls, payload, expected",
+        [
+            (
+                VapiProvider,
+                _VAPI_STATUS_PAYLOAD,
+                {
+                    "external_call_id": "vapi-call-1",
+                    "event_type": CallEventType.CALL_ENDED,
                     "transcript": "Full transcript",
                     "summary": "Call summary",
+                    "recording_url": "https://example.com/rec",
                 },
-            },
-        }
-        event = await provider.handle_webhook(payload)
-        assert event.external_call_id == "vapi-call-1"
-        assert event.event_type == CallEventType.CALL_ENDED
-        assert event.transcript == "Full transcript"
-        assert event.summary == "Call summary"
-        assert event.recording_url == "https://example.com/rec"
-
-    @pytest.mark.asyncio
-    async def test_vapi_transcript_update_maps_to_transcript_event(self):
-        provider = VapiProvider()
-        payload = {
-            "message": {
-                "type": "transcript",
-                "transcript": "Partial line",
-                "call": {"id": "vapi-call-2"},
-            },
-        }
-        event = await provider.handle_webhook(payload)
-        assert event.event_type == CallEventType.TRANSCRIPT_UPDATE
-        assert event.external_call_id == "vapi-call-2"
-
-
-class TestBlandWebhookNormalization:
-    @pytest.mark.asyncio
-    async def test_bland_completed_payload_maps_to_webhook_event(self):
-        provider = BlandProvider()
-        payload = {
-            "call_id": "bland-call-1",
-            "status": "completed",
-            "transcript": "Bland transcript",
-            "call_length": 90,
-            "recording_url": "https://bland.com/rec",
-        }
-        event = await provider.handle_webhook(payload)
-        assert event.external_call_id == "bland-call-1"
-        assert event.event_type == CallEventType.CALL_ENDED
-        assert event.transcript == "Bland transcript"
-        assert event.duration_seconds == 90
+            ),
+            (
+                VapiProvider,
+                _VAPI_TRANSCRIPT_PAYLOAD,
+                {
+                    "external_call_id": "vapi-call-2",
+                    "event_type": CallEventType.TRANSCRIPT_UPDATE,
+                },
+            ),
+            (
+                BlandProvider,
+                _BLAND_COMPLETED_PAYLOAD,
+                {
+                    "external_call_id": "bland-call-1",
+                    "event_type": CallEventType.CALL_ENDED,
+                    "transcript": "Bland transcript",
+                    "duration_seconds": 90,
+                },
+            ),
+        ],
+        ids=["vapi-ended", "vapi-transcript", "bland-ended"],
+    )
+    async def test_webhook_normalization(self, provider_cls, payload, expected):
+        event = await provider_cls().handle_webhook(payload)
+        for field, value in expected.items():
+            assert getattr(event, field) == value, field
 
 
 class TestWebhookEventToLegacy:
-    def test_call_ended_maps_to_completed(self):
-        ev = WebhookEvent(
-            event_type=CallEventType.CALL_ENDED,
-            external_call_id="x",
-            status="ended",
-        )
-        event_str, meta = _webhook_event_to_legacy(ev)
-        assert event_str == "completed"
-
-    def test_transcript_update_maps_to_transcript(self):
-        ev = WebhookEvent(
-            event_type=CallEventType.TRANSCRIPT_UPDATE,
-            external_call_id="x",
-        )
+    @pytest.mark.parametrize(
+        "event_type, status, expected_event, expected_meta_key",
+        [
+            (CallEventType.CALL_ENDED, "ended", "completed", None),
+            (CallEventType.TRANSCRIPT_UPDATE, None, "transcript", "message_data"),
+        ],
+        ids=["call_ended", "transcript_update"],
+    )
+    def test_maps_to_legacy_event(self, event_type, status, expected_event, expected_meta_key):
+        ev = WebhookEvent(event_type=event_type, external_call_id="x", status=status)
         event_str, meta = _webhook_event_to_legacy(ev)
-        assert event_str == "transcript"
-        assert "message_data" in meta
+        assert event_str == expected_event
+        if expected_meta_key:
+            assert expected_meta_key in meta
@@ -0,0 +1,12 @@
+"""
+Shared fixtures for voice provider tests.
+"""
+import pytest
+
+from app.services.voice.providers.vapi.provider import VapiProvider
+
+
+@pytest.fixture(scope="session")
+def vapi_provider() -> VapiProvider:
+    """handle_webhook keeps no per-call state, so one provider serves every test."""
+    return VapiProvider()
@@ -62,24 +62,32 @@ class TestEstimateCost:
 
 # ── log_llm_call — error swallowing ─────────────────────────────────────────
 
+@pytest.fixture
+def patched_sessionlocal(monkeypatch):
+    """Install a session factory as app.database.AsyncSessionLocal."""
+    def _apply(session_factory):
+        monkeypatch.setattr("app.database.AsyncSessionLocal", session_factory)
+        return session_factory
+    return _apply
+
+
 @pytest.mark.asyncio
-async def test_log_llm_call_swallows_db_error():
+async def test_log_llm_call_swallows_db_error(patched_sessionlocal):
     """DB failure must NOT propagate to caller."""
-    with patch("app.database.AsyncSessionLocal") as mock_session_cls:
-        mock_session = MagicMock()
-        mock_session.__aenter__ = AsyncMock(side_effect=RuntimeError("DB down"))
-        mock_session.__aexit__ = AsyncMock(return_value=False)
-        mock_session_cls.return_value = mock_session
-
-        # Should not raise
-        await log_llm_call(
-            provider="gemini",
-            model="gemini-2.5-flash",
-            call_type="qualification",
-            input_tokens=100,
-            output_tokens=50,
-            latency_ms=300,
-        )
+    mock_session = MagicMock()
+    mock_session.__aenter__ = AsyncMock(side_effect=RuntimeError("DB down"))
+    mock_session.__aexit__ = AsyncMock(return_value=False)
+    patched_sessionlocal(MagicMock(return_value=mock_session))
+
+    # Should not raise
+    await log_llm_call(
+        provider="gemini",
+        model="gemini-2.5-flash",
+        call_type="qualification",
+        input_tokens=100,
+        output_tokens=50,
+        latency_ms=300,
+    )
 
 
 @pytest.mark.asyncio
@@ -98,24 +106,24 @@ async def test_log_llm_call_swallows_import_error():
 
 
 @pytest.mark.asyncio
-async def test_log_llm_call_success_path():
+async def test_log_llm_call_success_path(patched_sessionlocal):
     """Happy path — writes a row and commits."""
     mock_db = AsyncMock()
     mock_db.__aenter__ = AsyncMock(return_value=mock_db)
     mock_db.__aexit__ = AsyncMock(return_value=False)
-
-    with patch("app.database.AsyncSessionLocal", return_value=mock_db):
-        await log_llm_call(
-            provider="claude",
-            model="claude-sonnet-4-6",
-            call_type="chat_response",
-            input_tokens=200,
-            output_tokens=80,
-            latency_ms=450,
-            broker_id=1,
-            lead_id=5,
-            used_fallback=False,
-        )
+    patched_sessionlocal(MagicMock(return_value=mock_db))
+
+    await log_llm_call(
+        provider="claude",
+        model="claude-sonnet-4-6",
+        call_type="chat_response",
+        input_tokens=200,
+        output_tokens=80,
+        latency_ms=450,
+        broker_id=1,
+        lead_id=5,
+        used_fallback=False,
+    )
 
     mock_db.add.assert_called_once()
     mock_db.commit.assert_called_once()
@@ -12,6 +12,25 @@ from httpx import AsyncClient
 from unittest.mock import patch, MagicMock
 
 
+_LONG_MESSAGE = "x" * 4001  # one past the 4000-char request limit
+
+_LEAD_ANALYSIS = {
+    "qualified": "maybe",
+    "interest_level": 7,
+    "budget": None,
+    "timeline": "30days",
+    "name": "Juan Pérez",
+    "phone": "+56912345678",
+    "email": None,
+    "salary": 1500000,
+    "location": "Las Condes",
+    "dicom_status": "clean",
+    "morosidad_amount": None,
+    "key_points": ["Interesado en Las Condes"],
+    "score_delta": 10
+}
+
+
 class TestChatValidation:
     """Test chat input validation"""
     
@@ -32,10 +51,9 @@ class TestChatValidation:
         self, client: AsyncClient, auth_headers
     ):
         """Test that messages over 4000 chars are rejected"""
-        long_message = "x" * 4001
         response = await client.post(
             "/api/v1/chat/test",
-            json={"message": long_message},
+            json={"message": _LONG_MESSAGE},
             headers=auth_headers
         )
         assert response.status_code == 422  # Validation error
@@ -88,28 +106,18 @@ class TestChatFlow:
     
     @pytest.mark.asyncio
     async def test_chat_with_existing_lead(
-        self, client: AsyncClient, auth_headers, mock_gemini
+        self, client: AsyncClient, auth_headers, mock_gemini, test_lead
     ):
         """Test chat with an existing lead"""
-        # First create a lead
-        create_response = await client.post(
-            "/api/v1/chat/test",
-            json={"message": "Primer mensaje"},
-            headers=auth_headers
-        )
-        assert create_response.status_code == 200
-        lead_id = create_response.json()["lead_id"]
-        
-        # Then continue conversation
         response = await client.post(
             "/api/v1/chat/test",
-            json={"message": "Segundo mensaje", "lead_id": lead_id},
+            json={"message": "Segundo mensaje", "lead_id": test_lead.id},
             headers=auth_headers
         )
         
         assert response.status_code == 200
         data = response.json()
-        assert data["lead_id"] == lead_id
+        assert data["lead_id"] == test_lead.id
     
     @pytest.mark.asyncio
     async def test_chat_nonexistent_lead_returns_404(
@@ -149,21 +157,7 @@ class TestChatLLMIntegration:
         """Test that chat extracts lead information from message"""
         # Mock the analysis response
         with patch("app.services.chat_orchestrator_service.LLMServiceFacade.analyze_lead_qualification") as mock_analyze:
-            mock_analyze.return_value = {
-                "qualified": "maybe",
-                "interest_level": 7,
-                "budget": None,
-                "timeline": "30days",
-                "name": "Juan Pérez",
-                "phone": "+56912345678",
-                "email": None,
-                "salary": 1500000,
-                "location": "Las Condes",
-                "dicom_status": "clean",
-                "morosidad_amount": None,
-                "key_points": ["Interesado en Las Condes"],
-                "score_delta": 10
-            }
+            mock_analyze.return_value = _LEAD_ANALYSIS
             
             response = await client.post(
                 "/api/v1/chat/test",
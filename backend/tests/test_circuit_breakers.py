@@ -39,36 +39,31 @@ def test_all_breakers_list_matches_get_breaker_states():
 
 # ── Breaker configuration ────────────────────────────────────────────────────
 
-def test_llm_breaker_has_correct_name():
-    assert llm_breaker.name == "llm"
-
-
-def test_calendar_breaker_has_correct_name():
-    assert calendar_breaker.name == "calendar"
-
-
-def test_telegram_breaker_has_correct_name():
-    assert telegram_breaker.name == "telegram"
-
-
-def test_llm_breaker_fail_max():
-    assert llm_breaker.fail_max == 5
-
-
-def test_calendar_breaker_fail_max():
-    assert calendar_breaker.fail_max == 3
-
-
-def test_telegram_breaker_fail_max():
-    assert telegram_breaker.fail_max == 5
-
-
-def test_llm_breaker_reset_timeout():
-    assert llm_breaker.reset_timeout == 30
-
-
-def test_calendar_breaker_reset_timeout():
-    assert calendar_breaker.reset_timeout == 60
+@pytest.mark.parametrize(
+    "breaker, attr, expected",
+    [
+        (llm_breaker, "name", "llm"),
+        (calendar_breaker, "name", "calendar"),
+        (telegram_breaker, "name", "telegram"),
+        (llm_breaker, "fail_max", 5),
+        (calendar_breaker, "fail_max", 3),
+        (telegram_breaker, "fail_max", 5),
+        (llm_breaker, "reset_timeout", 30),
+        (calendar_breaker, "reset_timeout", 60),
+    ],
+    ids=[
+        "llm-name",
+        "calendar-name",
+        "telegram-name",
+        "llm-fail_max",
+        "calendar-fail_max",
+        "telegram-fail_max",
+        "llm-reset_timeout",
+        "calendar-reset_timeout",
+    ],
+)
+def test_breaker_config(breaker, attr, expected):
+    assert getattr(breaker, attr) == expected
 
 
 # ── Sync call passes through on success ──────────────────────────────────────
@@ -8,9 +8,11 @@ Covers:
 - LLM failure during summarisation returns prior_summary (graceful fallback)
 - DB persistence of summary is attempted
 """
+from functools import lru_cache
+
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
 
+from app.services.llm import factory as llm_factory
 from app.services.chat.context_manager import (
     should_summarize,
     compress_context,
@@ -22,8 +24,13 @@ from app.services.chat.context_manager import (
 
 # ── Test data ────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=None)
 def _make_messages(n: int):
-    """Create n alternating user/assistant messages."""
+    """Create n alternating user/assistant messages.
+
+    Cached per size and shared between tests, which only read it; copy with
+    list(...) before mutating.
+    """
     msgs = []
     for i in range(n):
         role = "user" if i % 2 == 0 else "assistant"
@@ -31,6 +38,31 @@ def _make_messages(n: int):
     return msgs
 
 
+class FakeProvider:
+    """Minimal LLM provider double: records prompts, returns or raises."""
+
+    def __init__(self, response: str = "", configured: bool = True, raise_exc=None):
+        self.is_configured = configured
+        self._response = response
+        self._raise_exc = raise_exc
+        self.calls = []
+
+    async def generate_response(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs))
+        if self._raise_exc:
+            raise self._raise_exc
+        return self._response
+
+
+@pytest.fixture
+def use_provider(monkeypatch):
+    """Make get_llm_provider() return the given FakeProvider."""
+    def _install(fake: FakeProvider) -> FakeProvider:
+        monkeypatch.setattr(llm_factory, "get_llm_provider", lambda *a, **kw: fake)
+        return fake
+    return _install
+
+
 # ── should_summarize ─────────────────────────────────────────────────────────
 
 def test_should_summarize_below_threshold():
@@ -74,15 +106,12 @@ async def test_compress_context_no_existing_summary_below_threshold():
 # ── compress_context — at/above threshold ────────────────────────────────────
 
 @pytest.mark.asyncio
-async def test_compress_context_reduces_messages():
+async def test_compress_context_reduces_messages(use_provider):
     msgs = _make_messages(SUMMARIZE_THRESHOLD + 2)
 
-    mock_provider = MagicMock()
-    mock_provider.is_configured = True
-    mock_provider.generate_response = AsyncMock(return_value="• Lead interesado en 2D\n• Tiene renta 1.2M\n• Sin DICOM")
+    use_provider(FakeProvider("• Lead interesado en 2D\n• Tiene renta 1.2M\n• Sin DICOM"))
 
-    with patch("app.services.llm.factory.get_llm_provider", return_value=mock_provider):
-        summary, recent = await compress_context(msgs, existing_summary=None)
+    summary, recent = await compress_context(msgs, existing_summary=None)
 
     # Only KEEP_RECENT messages should remain
     assert len(recent) == KEEP_RECENT
@@ -92,47 +121,39 @@ async def test_compress_context_reduces_messages():
 
 
 @pytest.mark.asyncio
-async def test_compress_context_incorporates_prior_summary():
+async def test_compress_context_incorporates_prior_summary(use_provider):
     msgs = _make_messages(SUMMARIZE_THRESHOLD)
 
-    mock_provider = MagicMock()
-    mock_provider.is_configured = True
-    mock_provider.generate_response = AsyncMock(return_value="Resumen combinado")
+    fake = use_provider(FakeProvider("Resumen combinado"))
 
-    with patch("app.services.llm.factory.get_llm_provider", return_value=mock_provider):
-        summary, _ = await compress_context(msgs, existing_summary="Resumen previo")
+    summary, _ = await compress_context(msgs, existing_summary="Resumen previo")
 
     # LLM was called (prior summary injected into prompt)
-    mock_provider.generate_response.assert_called_once()
-    call_prompt = mock_provider.generate_response.call_args[0][0]
+    assert len(fake.calls) == 1
+    call_prompt = fake.calls[0][0]
     assert "Resumen previo" in call_prompt
 
 
 @pytest.mark.asyncio
-async def test_compress_context_llm_failure_returns_prior_summary():
+async def test_compress_context_llm_failure_returns_prior_summary(use_provider):
     """When LLM fails, prior_summary is returned and pipeline is not broken."""
     msgs = _make_messages(SUMMARIZE_THRESHOLD)
 
-    mock_provider = MagicMock()
-    mock_provider.is_configured = True
-    mock_provider.generate_response = AsyncMock(side_effect=RuntimeError("LLM down"))
+    use_provider(FakeProvider(raise_exc=RuntimeError("LLM down")))
 
-    with patch("app.services.llm.factory.get_llm_provider", return_value=mock_provider):
-        summary, recent = await compress_context(msgs, existing_summary="prior summary")
+    summary, recent = await compress_context(msgs, existing_summary="prior summary")
 
     assert summary == "prior summary"
     assert recent == msgs[-KEEP_RECENT:]
 
 
 @pytest.mark.asyncio
-async def test_compress_context_unconfigured_provider_returns_prior():
+async def test_compress_context_unconfigured_provider_returns_prior(use_provider):
     msgs = _make_messages(SUMMARIZE_THRESHOLD)
 
-    mock_provider = MagicMock()
-    mock_provider.is_configured = False
+    use_provider(FakeProvider(configured=False))
 
-    with patch("app.services.llm.factory.get_llm_provider", return_value=mock_provider):
-        summary, recent = await compress_context(msgs, existing_summary="saved summary")
+    summary, recent = await compress_context(msgs, existing_summary="saved summary")
 
     assert summary == "saved summary"
 
@@ -140,32 +161,26 @@ async def test_compress_context_unconfigured_provider_returns_prior():
 # ── summarize_conversation ───────────────────────────────────────────────────
 
 @pytest.mark.asyncio
-async def test_summarize_conversation_calls_llm():
+async def test_summarize_conversation_calls_llm(use_provider):
     msgs = [
         {"role": "user", "content": "Hola, busco depto"},
         {"role": "assistant", "content": "¿Cuánto es tu renta?"},
         {"role": "user", "content": "1.200.000"},
     ]
-    mock_provider = MagicMock()
-    mock_provider.is_configured = True
-    mock_provider.generate_response = AsyncMock(return_value="• Busca depto • Renta 1.2M")
+    fake = use_provider(FakeProvider("• Busca depto • Renta 1.2M"))
 
-    with patch("app.services.llm.factory.get_llm_provider", return_value=mock_provider):
-        result = await summarize_conversation(msgs)
+    result = await summarize_conversation(msgs)
 
     assert "1.2M" in result or result  # summary returned
-    mock_provider.generate_response.assert_called_once()
+    assert len(fake.calls) == 1
 
 
 @pytest.mark.asyncio
-async def test_summarize_conversation_includes_prior_summary_in_prompt():
+async def test_summarize_conversation_includes_prior_summary_in_prompt(use_provider):
     msgs = [{"role": "user", "content": "¿Tienen estacionamiento?"}]
-    mock_provider = MagicMock()
-    mock_provider.is_configured = True
-    mock_provider.generate_response = AsyncMock(return_value="Nuevo resumen")
+    fake = use_provider(FakeProvider("Nuevo resumen"))
 
-    with patch("app.services.llm.factory.get_llm_provider", return_value=mock_provider):
-        await summarize_conversation(msgs, prior_summary="Resumen anterior")
+    await summarize_conversation(msgs, prior_summary="Resumen anterior")
 
-    prompt = mock_provider.generate_response.call_args[0][0]
+    prompt = fake.calls[0][0]
     assert "Resumen anterior" in prompt
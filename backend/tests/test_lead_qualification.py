@@ -8,17 +8,16 @@ Covers:
 - analyze_lead_qualification returns all required fields even on LLM failure
 - LLM JSON malformed response → defaults are applied
 """
-import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
-REQUIRED_KEYS = {
+REQUIRED_KEYS = frozenset({
     "qualified", "interest_level", "budget", "timeline",
     "name", "phone", "email", "salary", "location",
     "dicom_status", "morosidad_amount", "key_points", "score_delta",
-}
+})
 
 
 def _mock_provider_with_json(json_result: dict):
@@ -39,7 +38,6 @@ def _mock_provider_failing():
 
 # ── Required fields always present ──────────────────────────────────────────
 
-@pytest.mark.asyncio
 async def test_all_required_fields_present_on_success():
     from app.services.llm.facade import LLMServiceFacade
 
@@ -52,10 +50,9 @@ async def test_all_required_fields_present_on_success():
     with patch("app.services.llm.facade.get_fast_llm_provider", return_value=provider):
         result = await LLMServiceFacade.analyze_lead_qualification("Mi sueldo es 2M")
 
-    assert REQUIRED_KEYS.issubset(result.keys()), f"Missing keys: {REQUIRED_KEYS - result.keys()}"
+    assert result.keys() >= REQUIRED_KEYS, f"Missing keys: {REQUIRED_KEYS - result.keys()}"
 
 
-@pytest.mark.asyncio
 async def test_all_required_fields_present_on_llm_failure():
     from app.services.llm.facade import LLMServiceFacade
 
@@ -63,11 +60,10 @@ async def test_all_required_fields_present_on_llm_failure():
     with patch("app.services.llm.facade.get_fast_llm_provider", return_value=provider):
         result = await LLMServiceFacade.analyze_lead_qualification("mensaje")
 
-    assert REQUIRED_KEYS.issubset(result.keys())
+    assert result.keys() >= REQUIRED_KEYS
     assert result["qualified"] == "maybe"
 
 
-@pytest.mark.asyncio
 async def test_all_required_fields_present_on_partial_llm_response():
     """LLM returns only some fields — defaults fill the rest."""
     from app.services.llm.facade import LLMServiceFacade
@@ -76,14 +72,13 @@ async def test_all_required_fields_present_on_partial_llm_response():
     with patch("app.services.llm.facade.get_fast_llm_provider", return_value=provider):
         result = await LLMServiceFacade.analyze_lead_qualification("No me interesa")
 
-    assert REQUIRED_KEYS.issubset(result.keys())
+    assert result.keys() >= REQUIRED_KEYS
     assert result["budget"] is None
     assert result["name"] is None
 
 
 # ── Provider not configured ──────────────────────────────────────────────────
 
-@pytest.mark.asyncio
 async def test_returns_defaults_when_provider_not_configured():
     from app.services.llm.facade import LLMServiceFacade
 
@@ -98,7 +93,6 @@ async def test_returns_defaults_when_provider_not_configured():
 
 # ── DICOM extraction ─────────────────────────────────────────────────────────
 
-@pytest.mark.asyncio
 async def test_dicom_clean_extracted():
     from app.services.llm.facade import LLMServiceFacade
 
@@ -117,7 +111,6 @@ async def test_dicom_clean_extracted():
     assert result["dicom_status"] == "clean"
 
 
-@pytest.mark.asyncio
 async def test_dicom_has_debt_extracted():
     from app.services.llm.facade import LLMServiceFacade
 
@@ -140,7 +133,6 @@ async def test_dicom_has_debt_extracted():
 
 # ── Score delta is stored as-is (clamping happens in DB update) ──────────────
 
-@pytest.mark.asyncio
 async def test_score_delta_preserved():
     from app.services.llm.facade import LLMServiceFacade
 
@@ -156,7 +148,6 @@ async def test_score_delta_preserved():
     assert result["score_delta"] == 20
 
 
-@pytest.mark.asyncio
 async def test_score_delta_negative_preserved():
     from app.services.llm.facade import LLMServiceFacade
 
@@ -174,7 +165,6 @@ async def test_score_delta_negative_preserved():
 
 # ── key_points list ──────────────────────────────────────────────────────────
 
-@pytest.mark.asyncio
 async def test_key_points_is_always_a_list():
     from app.services.llm.facade import LLMServiceFacade
 
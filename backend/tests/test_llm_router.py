@@ -10,29 +10,45 @@ Covers:
 - used_fallback flag on LLMRouter
 """
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 from app.services.llm.router import LLMRouter, _is_retriable
-from app.services.llm.base_provider import LLMResponse
+from app.services.llm.base_provider import BaseLLMProvider, LLMResponse
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+_PROVIDER_METHODS = (
+    "generate_with_messages",
+    "generate_json",
+    "generate_with_tools",
+    "generate_response",
+)
+
+
 def _make_provider(response=None, side_effect=None):
     """Create a minimal mock BaseLLMProvider."""
-    p = MagicMock()
-    p.is_configured = True
-    p.model = "test-model"
-    p.generate_with_messages = AsyncMock(return_value=response, side_effect=side_effect)
-    p.generate_json = AsyncMock(return_value=response, side_effect=side_effect)
-    p.generate_with_tools = AsyncMock(return_value=response, side_effect=side_effect)
-    p.generate_response = AsyncMock(return_value=response, side_effect=side_effect)
+    p = MagicMock(spec=BaseLLMProvider, is_configured=True, model="test-model")
+    for name in _PROVIDER_METHODS:
+        setattr(p, name, AsyncMock(return_value=response, side_effect=side_effect))
     return p
 
 
 _GOOD_RESPONSE = LLMResponse(content="Hola, ¿en qué puedo ayudarte?")
 
 
+@pytest.fixture(scope="module")
+def _shared_good_primary():
+    return _make_provider(response=_GOOD_RESPONSE)
+
+
+@pytest.fixture
+def good_primary(_shared_good_primary):
+    """Module-wide provider that always succeeds; call history reset per test."""
+    _shared_good_primary.reset_mock()
+    return _shared_good_primary
+
+
 # ── _is_retriable ─────────────────────────────────────────────────────────────
 
 def test_is_retriable_httpx_timeout():
@@ -45,6 +61,11 @@ def test_is_retriable_httpx_connect():
     assert _is_retriable(httpx.ConnectError("connect")) is True
 
 
+def test_is_retriable_httpx_read_error():
+    import httpx
+    assert _is_retriable(httpx.ReadError("connection reset")) is True
+
+
 def test_is_retriable_generic_value_error():
     assert _is_retriable(ValueError("bad value")) is False
 
@@ -57,65 +78,76 @@ def test_is_retriable_key_error():
     assert _is_retriable(KeyError("missing")) is False
 
 
+@pytest.fixture(autouse=True)
+def _bypass_breaker(monkeypatch):
+    """Call providers directly, bypassing the shared LLM circuit breaker.
+
+    The router imports call_async_protected per call, so patching the module
+    attribute takes effect and failures here can't trip the global breaker.
+    """
+    async def _passthrough(breaker, fn, *a, **kw):
+        return await fn(*a, **kw)
+    monkeypatch.setattr("app.core.circuit_breakers.call_async_protected", _passthrough)
+
+
 # ── LLMRouter happy path ──────────────────────────────────────────────────────
 
-@pytest.mark.asyncio
-async def test_router_uses_primary_on_success():
-    primary = _make_provider(response=_GOOD_RESPONSE)
+async def test_router_uses_primary_on_success(good_primary):
+    primary = good_primary
     fallback = _make_provider(response=LLMResponse(content="fallback"))
 
-    async def _passthrough(fn, *a, **kw): return await fn(*a, **kw)
-    with patch("app.core.circuit_breakers.llm_breaker.call_async", new=_passthrough):
-        router = LLMRouter(primary=primary, fallback=fallback)
-        result = await router.generate_with_messages([], system_prompt="test")
+    router = LLMRouter(primary=primary, fallback=fallback)
+    result = await router.generate_with_messages([], system_prompt="test")
 
     assert result.content == _GOOD_RESPONSE.content
     primary.generate_with_messages.assert_called_once()
     fallback.generate_with_messages.assert_not_called()
 
 
-@pytest.mark.asyncio
+async def test_router_dispatches_to_reassigned_primary():
+    primary = _make_provider(response=LLMResponse(content="old"))
+    fallback = _make_provider(response=LLMResponse(content="fallback"))
+
+    router = LLMRouter(primary=primary, fallback=fallback)
+    router.primary = _make_provider(response=LLMResponse(content="new"))
+
+    result = await router.generate_with_messages([], system_prompt="test")
+
+    assert result.content == "new"
+
+
 async def test_router_failover_on_retriable_error():
     import httpx
     primary = _make_provider(side_effect=httpx.TimeoutException("timeout"))
     fallback = _make_provider(response=LLMResponse(content="from fallback"))
 
-    # Bypass circuit breaker in unit tests
-    async def _passthrough(fn, *a, **kw): return await fn(*a, **kw)
-    with patch("app.core.circuit_breakers.llm_breaker.call_async", new=_passthrough):
-        router = LLMRouter(primary=primary, fallback=fallback)
-        result = await router.generate_with_messages([], system_prompt="test")
+    router = LLMRouter(primary=primary, fallback=fallback)
+    result = await router.generate_with_messages([], system_prompt="test")
 
     assert result.content == "from fallback"
     fallback.generate_with_messages.assert_called_once()
 
 
-@pytest.mark.asyncio
 async def test_router_no_failover_on_non_retriable_error():
     primary = _make_provider(side_effect=ValueError("bad request — not retriable"))
     fallback = _make_provider(response=LLMResponse(content="from fallback"))
 
-    async def _passthrough(fn, *a, **kw): return await fn(*a, **kw)
-    with patch("app.core.circuit_breakers.llm_breaker.call_async", new=_passthrough):
-        router = LLMRouter(primary=primary, fallback=fallback)
-        with pytest.raises(ValueError, match="bad request"):
-            await router.generate_with_messages([], system_prompt="test")
+    router = LLMRouter(primary=primary, fallback=fallback)
+    with pytest.raises(ValueError, match="bad request"):
+        await router.generate_with_messages([], system_prompt="test")
 
     # Fallback must NOT be called for non-retriable errors
     fallback.generate_with_messages.assert_not_called()
 
 
-@pytest.mark.asyncio
 async def test_router_raises_when_both_fail():
     import httpx
     primary = _make_provider(side_effect=httpx.TimeoutException("timeout"))
     fallback = _make_provider(side_effect=httpx.ConnectError("refused"))
 
-    async def _passthrough(fn, *a, **kw): return await fn(*a, **kw)
-    with patch("app.core.circuit_breakers.llm_breaker.call_async", new=_passthrough):
-        router = LLMRouter(primary=primary, fallback=fallback)
-        with pytest.raises(Exception):
-            await router.generate_with_messages([], system_prompt="test")
+    router = LLMRouter(primary=primary, fallback=fallback)
+    with pytest.raises(Exception):
+        await router.generate_with_messages([], system_prompt="test")
 
 
 # ── is_configured property ────────────────────────────────────────────────────